@@ -5,13 +5,13 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models.database import User, get_db
 from backend.services.auth import (
-    hash_password,
-    verify_password,
+    ahash_password,
+    averify_password,
     create_access_token,
     decode_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
@@ -99,19 +99,22 @@ async def signup(request: SignupRequest, db: AsyncSession = Depends(get_db)):
             detail="Username already taken",
         )
     
-    # Create user
-    user = User(
-        username=request.username,
-        email=request.email,
-        password_hash=hash_password(request.password),
+    # Create user; RETURNING hands back the id without a refresh
+    result = await db.execute(
+        insert(User)
+        .values(
+            username=request.username,
+            email=request.email,
+            password_hash=await ahash_password(request.password),
+        )
+        .returning(User.id)
     )
-    db.add(user)
+    user_id = result.scalar_one()
     await db.commit()
-    await db.refresh(user)
     
     # Create token
     access_token = create_access_token(
-        data={"sub": str(user.id)},
+        data={"sub": str(user_id)},
         expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
     )
     
@@ -124,7 +127,7 @@ async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == request.email))
     user = result.scalar_one_or_none()
     
-    if user is None or not verify_password(request.password, user.password_hash):
+    if user is None or not await averify_password(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -4,12 +4,16 @@ All game interactions (vs AI and PvP) go through WebSocket for consistency.
 """
 
 import json
+import time
 import asyncio
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
+import numpy as np
 from fastapi import WebSocket, WebSocketDisconnect
-from sqlalchemy import select
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models.database import Game, User, async_session_maker
@@ -19,9 +23,29 @@ from roulette.agents import AGENT_REGISTRY
 from roulette.agents.base import Agent
 from roulette.game.ugolki import Ugolki
 
-# Store active WebSocket connections per game
-# game_id -> {user_id: websocket}
-active_connections: dict[int, dict[int, WebSocket]] = {}
+# Outbound messages are queued per connection and written by a relay task,
+# so handlers never wait on a slow client's socket.
+OUTBOUND_QUEUE_SIZE = 32
+
+# Message types that may be dropped when a client's queue is full; a newer
+# message of the same kind supersedes them.
+DROPPABLE_MESSAGE_TYPES = {"game_state", "open_games"}
+
+
+@dataclass
+class Channel:
+    """A client connection with its outbound message queue."""
+
+    websocket: WebSocket
+    queue: asyncio.Queue[tuple[str, str]] = field(
+        default_factory=lambda: asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+    )
+    relay_task: asyncio.Task | None = None
+
+
+# Store active connections per game
+# game_id -> {user_id: channel}
+active_connections: dict[int, dict[int, Channel]] = {}
 
 # Store active game instances
 # game_id -> Ugolki instance
@@ -34,8 +58,32 @@ active_agents: dict[int, Agent] = {}
 DEFAULT_AGENT_ID = "random"
 
 
-async def get_user_from_token(token: str, db: AsyncSession) -> User | None:
-    """Validate token and get user."""
+@dataclass
+class AuthenticatedUser:
+    """Identity established from a token when a connection opens."""
+
+    user_id: int
+    username: str
+    expires_at: float  # Token expiry as a Unix timestamp
+
+
+# Recently validated tokens, so clients that reconnect skip the JWT check and
+# user lookup. token -> (user, cached_at)
+TOKEN_CACHE_TTL = 60.0  # seconds
+TOKEN_CACHE_SIZE = 10_000
+token_cache: dict[str, tuple[AuthenticatedUser, float]] = {}
+
+
+async def get_user_from_token(token: str) -> AuthenticatedUser | None:
+    """Validate token and get user, opening a database session only on a cache miss."""
+    now = time.time()
+    cached = token_cache.get(token)
+    if cached is not None:
+        user, cached_at = cached
+        if now - cached_at < TOKEN_CACHE_TTL and now < user.expires_at:
+            return user
+        del token_cache[token]
+    
     payload = decode_token(token)
     if payload is None:
         return None
@@ -44,51 +92,159 @@ async def get_user_from_token(token: str, db: AsyncSession) -> User | None:
     if user_id is None:
         return None
     
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    return result.scalar_one_or_none()
+    async with async_session_maker() as db:
+        result = await db.execute(select(User).where(User.id == int(user_id)))
+        user = result.scalar_one_or_none()
+    if user is None:
+        return None
+    
+    authenticated = AuthenticatedUser(user_id=user.id, username=user.username, expires_at=payload["exp"])
+    if len(token_cache) >= TOKEN_CACHE_SIZE:
+        # Evict the oldest entry (dicts keep insertion order)
+        del token_cache[next(iter(token_cache))]
+    token_cache[token] = (authenticated, now)
+    return authenticated
 
 
-async def send_message(websocket: WebSocket, msg_type: str, data: dict[str, Any]) -> None:
-    """Send a typed message through WebSocket."""
-    await websocket.send_json({"type": msg_type, "data": data})
+async def relay(channel: Channel) -> None:
+    """Write queued messages to the channel's socket until the client disconnects.
 
+    Messages queued together (e.g. a final game_state and game_over) are sent
+    as one `batch` frame rather than one frame each.
+    """
+    while True:
+        batch = [await channel.queue.get()]
+        while not channel.queue.empty():
+            batch.append(channel.queue.get_nowait())
+        
+        if len(batch) == 1:
+            frame = batch[0][1]
+        else:
+            # Payloads are already encoded JSON objects, so they can be joined as is
+            frame = '{"type": "batch", "msgs": [' + ", ".join(payload for _, payload in batch) + "]}"
+        
+        try:
+            await channel.websocket.send_text(frame)
+        except WebSocketDisconnect:
+            return
+        for _ in batch:
+            channel.queue.task_done()
+
+
+async def flush(channel: Channel) -> None:
+    """Wait until all queued messages are written or the relay has stopped."""
+    join_task = asyncio.create_task(channel.queue.join())
+    await asyncio.wait({join_task, channel.relay_task}, return_when=asyncio.FIRST_COMPLETED)
+    join_task.cancel()
+
+
+def drop_stale_message(queue: asyncio.Queue[tuple[str, str]]) -> None:
+    """Remove the oldest droppable message from a full queue, if there is one."""
+    pending = [queue.get_nowait() for _ in range(queue.qsize())]
+    for i, (msg_type, _) in enumerate(pending):
+        if msg_type in DROPPABLE_MESSAGE_TYPES:
+            del pending[i]
+            queue.task_done()
+            break
+    for message in pending:
+        queue.put_nowait(message)
+        queue.task_done()
+
+
+def enqueue(channel: Channel, msg_type: str, payload: str) -> None:
+    """Queue an encoded message for delivery.
+
+    Raises asyncio.QueueFull if the queue holds only undroppable messages.
+    """
+    if channel.queue.full():
+        drop_stale_message(channel.queue)
+    channel.queue.put_nowait((msg_type, payload))
 
-async def broadcast_to_game(game_id: int, msg_type: str, data: dict[str, Any], exclude_user: int | None = None) -> None:
-    """Broadcast a message to all players in a game."""
+
+def send_message(channel: Channel, msg_type: str, data: dict[str, Any]) -> None:
+    """Send a typed message to a single client."""
+    enqueue(channel, msg_type, json.dumps({"type": msg_type, "data": data}))
+
+
+def broadcast_payload(game_id: int, msg_type: str, payload: str, exclude_user: int | None = None) -> None:
+    """Broadcast an already encoded message to all players in a game."""
     if game_id not in active_connections:
         return
     
-    for user_id, ws in active_connections[game_id].items():
+    for user_id, channel in active_connections[game_id].items():
         if exclude_user is not None and user_id == exclude_user:
             continue
-        await send_message(ws, msg_type, data)
+        enqueue(channel, msg_type, payload)
 
 
-def board_to_list(game: Ugolki) -> list[list[int]]:
-    """Convert Ugolki board tensor to list for JSON serialization."""
-    return game.board.tolist()
+def broadcast_to_game(game_id: int, msg_type: str, data: dict[str, Any], exclude_user: int | None = None) -> None:
+    """Broadcast a message to all players in a game, encoding it once for all of them."""
+    payload = json.dumps({"type": msg_type, "data": data})
+    broadcast_payload(game_id, msg_type, payload, exclude_user)
 
 
-def get_game_state(game: Ugolki, db_game: Game) -> dict[str, Any]:
-    """Get current game state as dict."""
+def board_to_list(game: Ugolki) -> list[list[int]]:
+    """Convert Ugolki board to list for JSON serialization."""
+    return game.to_array().tolist()
+
+
+def restore_game(db_game: Game) -> Ugolki:
+    """Rebuild a game instance from its stored int8 board bytes."""
+    if not isinstance(db_game.board_state, bytes) or len(db_game.board_state) != 64:
+        # Legacy JSON boards are converted by the migration in deployment.md
+        raise ValueError(f"Game {db_game.id} has no stored int8 board; run the board migration")
+    board = np.frombuffer(db_game.board_state, dtype=np.int8).reshape(8, 8)
+    ugolki = Ugolki(board)
+    ugolki.turn = db_game.current_turn
+    return ugolki
+
+
+def get_game_state(
+    game: Ugolki,
+    db_game: Game,
+    board: list[list[int]] | None = None,
+) -> dict[str, Any]:
+    """Get current game state as dict.
+
+    Pass `board` when the caller already converted the board (e.g. to store it),
+    so it isn't converted twice.
+    """
+    if board is None:
+        board = board_to_list(game)
     return {
         "game_id": db_game.id,
-        "board": board_to_list(game),
+        "board": board,
         "turn": game.turn,
         "status": db_game.status,
         "game_type": db_game.game_type,
         "white_player_id": db_game.white_player_id,
         "black_player_id": db_game.black_player_id,
-        "legal_moves": [
-            {"from": list(from_pos), "to": list(to_pos)}
-            for from_pos, to_pos in game.get_legal_actions()
-        ],
+        "legal_moves": legal_moves_to_list(game),
     }
 
 
+def parse_position(value: Any) -> tuple[int, int] | None:
+    """A [row, col] pair from a client message, or None if it isn't two ints."""
+    if (
+        isinstance(value, (list, tuple))
+        and len(value) == 2
+        and all(type(coord) is int for coord in value)
+    ):
+        return (value[0], value[1])
+    return None
+
+
+def legal_moves_to_list(game: Ugolki) -> list[dict[str, list[int]]]:
+    """Legal moves in the wire format used by game_state messages."""
+    return [
+        {"from": list(from_pos), "to": list(to_pos)}
+        for from_pos, to_pos in game.get_legal_actions()
+    ]
+
+
 async def handle_create_game(
-    websocket: WebSocket,
-    user: User,
+    channel: Channel,
+    user_id: int,
     data: dict[str, Any],
     db: AsyncSession,
 ) -> None:
@@ -98,51 +254,65 @@ async def handle_create_game(
     
     # Validate agent_id for AI games
     if game_type == "ai" and agent_id not in AGENT_REGISTRY:
-        await send_message(websocket, "error", {"message": f"Unknown agent: {agent_id}"})
+        send_message(channel, "error", {"message": f"Unknown agent: {agent_id}"})
         return
     
     # Create new Ugolki game
     ugolki = Ugolki.create_game()
+    board = board_to_list(ugolki)
     
-    # Create database record
-    db_game = Game(
-        white_player_id=user.id,
-        black_player_id=None,
-        game_type=game_type,
-        status="active" if game_type == "ai" else "waiting",
-        board_state=json.dumps(board_to_list(ugolki)),
-        current_turn="white",
+    # Create database record; RETURNING hands back the id without a refresh
+    status = "active" if game_type == "ai" else "waiting"
+    result = await db.execute(
+        insert(Game)
+        .values(
+            white_player_id=user_id,
+            black_player_id=None,
+            game_type=game_type,
+            status=status,
+            current_turn="white",
+            board_state=Game.encode_board(board),
+        )
+        .returning(Game.id)
     )
-    db.add(db_game)
+    game_id = result.scalar_one()
     await db.commit()
-    await db.refresh(db_game)
     
     # Store game instance
-    active_games[db_game.id] = ugolki
+    active_games[game_id] = ugolki
     
     # Store AI agent for this game
     if game_type == "ai":
-        active_agents[db_game.id] = AGENT_REGISTRY[agent_id]["factory"]()
+        active_agents[game_id] = AGENT_REGISTRY[agent_id]["factory"]()
     
     # Store connection
-    if db_game.id not in active_connections:
-        active_connections[db_game.id] = {}
-    active_connections[db_game.id][user.id] = websocket
+    if game_id not in active_connections:
+        active_connections[game_id] = {}
+    active_connections[game_id][user_id] = channel
     
-    # Send game state
-    await send_message(websocket, "game_created", get_game_state(ugolki, db_game))
+    # Send game state, built from the values just inserted
+    send_message(channel, "game_created", {
+        "game_id": game_id,
+        "board": board,
+        "turn": ugolki.turn,
+        "status": status,
+        "game_type": game_type,
+        "white_player_id": user_id,
+        "black_player_id": None,
+        "legal_moves": legal_moves_to_list(ugolki),
+    })
 
 
 async def handle_join_game(
-    websocket: WebSocket,
-    user: User,
+    channel: Channel,
+    user_id: int,
     data: dict[str, Any],
     db: AsyncSession,
 ) -> None:
     """Handle joining an existing game."""
     game_id = data.get("game_id")
     if game_id is None:
-        await send_message(websocket, "error", {"message": "game_id required"})
+        send_message(channel, "error", {"message": "game_id required"})
         return
     
     # Get game from database
@@ -150,30 +320,26 @@ async def handle_join_game(
     db_game = result.scalar_one_or_none()
     
     if db_game is None:
-        await send_message(websocket, "error", {"message": "Game not found"})
+        send_message(channel, "error", {"message": "Game not found"})
         return
     
     if db_game.status != "waiting":
-        await send_message(websocket, "error", {"message": "Game is not available to join"})
+        send_message(channel, "error", {"message": "Game is not available to join"})
         return
     
-    if db_game.white_player_id == user.id:
-        await send_message(websocket, "error", {"message": "Cannot join your own game"})
+    if db_game.white_player_id == user_id:
+        send_message(channel, "error", {"message": "Cannot join your own game"})
         return
     
     # Join as black player
-    db_game.black_player_id = user.id
+    db_game.black_player_id = user_id
     db_game.status = "active"
     await db.commit()
     
     # Get or create game instance
     if game_id not in active_games:
         # Restore from database
-        board_list = json.loads(db_game.board_state)
-        import torch
-        board = torch.tensor(board_list, dtype=torch.long)
-        ugolki = Ugolki(board)
-        ugolki.turn = db_game.current_turn
+        ugolki = restore_game(db_game)
         active_games[game_id] = ugolki
     else:
         ugolki = active_games[game_id]
@@ -181,16 +347,30 @@ async def handle_join_game(
     # Store connection
     if game_id not in active_connections:
         active_connections[game_id] = {}
-    active_connections[game_id][user.id] = websocket
+    active_connections[game_id][user_id] = channel
     
     # Notify both players
     game_state = get_game_state(ugolki, db_game)
-    await broadcast_to_game(game_id, "game_started", game_state)
+    broadcast_to_game(game_id, "game_started", game_state)
+
+
+async def commit_move(db: AsyncSession, game_id: int) -> None:
+    """Commit a move whose resulting state has already been broadcast.
+
+    If the commit fails, players are told their view is stale before the
+    error propagates.
+    """
+    try:
+        await db.commit()
+    except SQLAlchemyError:
+        await db.rollback()
+        broadcast_to_game(game_id, "error", {"message": "Failed to save move"})
+        raise
 
 
 async def handle_move(
-    websocket: WebSocket,
-    user: User,
+    channel: Channel,
+    user_id: int,
     data: dict[str, Any],
     db: AsyncSession,
 ) -> None:
@@ -200,7 +380,7 @@ async def handle_move(
     to_pos = data.get("to")  # [row, col]
     
     if game_id is None or from_pos is None or to_pos is None:
-        await send_message(websocket, "error", {"message": "game_id, from, and to required"})
+        send_message(channel, "error", {"message": "game_id, from, and to required"})
         return
     
     # Get game from database
@@ -208,69 +388,75 @@ async def handle_move(
     db_game = result.scalar_one_or_none()
     
     if db_game is None:
-        await send_message(websocket, "error", {"message": "Game not found"})
+        send_message(channel, "error", {"message": "Game not found"})
         return
     
     if db_game.status != "active":
-        await send_message(websocket, "error", {"message": "Game is not active"})
+        send_message(channel, "error", {"message": "Game is not active"})
         return
     
     # Get game instance
     if game_id not in active_games:
-        await send_message(websocket, "error", {"message": "Game not loaded"})
+        send_message(channel, "error", {"message": "Game not loaded"})
         return
     
     ugolki = active_games[game_id]
     
     # Validate it's the user's turn
-    is_white = db_game.white_player_id == user.id
-    is_black = db_game.black_player_id == user.id
+    is_white = db_game.white_player_id == user_id
+    is_black = db_game.black_player_id == user_id
     
     if ugolki.turn == "white" and not is_white:
-        await send_message(websocket, "error", {"message": "Not your turn"})
+        send_message(channel, "error", {"message": "Not your turn"})
         return
     if ugolki.turn == "black" and not is_black:
-        await send_message(websocket, "error", {"message": "Not your turn"})
+        send_message(channel, "error", {"message": "Not your turn"})
         return
     
-    # Validate move is legal
-    action = (tuple(from_pos), tuple(to_pos))
-    legal_actions = ugolki.get_legal_actions()
-    if action not in legal_actions:
-        await send_message(websocket, "error", {"message": "Illegal move"})
+    # Validate move is legal; malformed positions can't be looked up in the set
+    parsed_from = parse_position(from_pos)
+    parsed_to = parse_position(to_pos)
+    if parsed_from is None or parsed_to is None:
+        send_message(channel, "error", {"message": "Illegal move"})
+        return
+    action = (parsed_from, parsed_to)
+    if action not in ugolki.get_legal_action_set():
+        send_message(channel, "error", {"message": "Illegal move"})
         return
     
     # Apply the move
-    step_result = ugolki.step(action)
+    winner = ugolki.play(action)
     
     # Update database
-    db_game.board_state = json.dumps(board_to_list(ugolki))
+    board = board_to_list(ugolki)
+    db_game.set_board_from_list(board)
     db_game.current_turn = ugolki.turn
     
-    if step_result.done:
+    if winner is not None:
         db_game.status = "completed"
         db_game.completed_at = datetime.utcnow()
-        winner = step_result.info.get("winner")
         if winner == "white":
             db_game.winner_id = db_game.white_player_id
         elif winner == "black":
             db_game.winner_id = db_game.black_player_id
         
-        # Update ELO for PvP games
+        # Update ELO for PvP games; committed by commit_move after the broadcast
         if db_game.game_type == "pvp" and db_game.black_player_id:
             await update_elo_after_game(db, db_game, winner)
     
-    await db.commit()
-    
-    # Broadcast updated state
-    game_state = get_game_state(ugolki, db_game)
-    await broadcast_to_game(game_id, "game_state", game_state)
+    # Broadcast updated state; the relay tasks deliver it while we commit
+    game_state = get_game_state(ugolki, db_game, board=board)
+    broadcast_to_game(game_id, "game_state", game_state)
     
-    if step_result.done:
-        await broadcast_to_game(game_id, "game_over", {
-            "winner": step_result.info.get("winner"),
+    if winner is not None:
+        broadcast_to_game(game_id, "game_over", {
+            "winner": winner,
             "winner_id": db_game.winner_id,
         })
+    
+    await commit_move(db, game_id)
+    
+    if winner is not None:
         return
     
     # If playing against AI and it's AI's turn, make AI move
@@ -288,43 +474,47 @@ async def make_ai_move(game_id: int, db: AsyncSession) -> None:
     if agent is None:
         return
     
-    # Small delay to make it feel more natural
-    await asyncio.sleep(0.5)
+    # Small delay to make it feel more natural; choosing the move and loading
+    # the game happen during it rather than after it
+    delay = asyncio.create_task(asyncio.sleep(0.5))
     
     # Get AI move
     action = agent.select_action(ugolki)
-    step_result = ugolki.step(action)
     
-    # Update database
     result = await db.execute(select(Game).where(Game.id == game_id))
     db_game = result.scalar_one_or_none()
     
     if db_game is None:
+        delay.cancel()
         return
     
-    db_game.board_state = json.dumps(board_to_list(ugolki))
+    await delay
+    winner = ugolki.play(action)
+    
+    # Update database
+    board = board_to_list(ugolki)
+    db_game.set_board_from_list(board)
     db_game.current_turn = ugolki.turn
     
-    if step_result.done:
+    if winner is not None:
         db_game.status = "completed"
         db_game.completed_at = datetime.utcnow()
-        winner = step_result.info.get("winner")
         if winner == "white":
             db_game.winner_id = db_game.white_player_id
         elif winner == "black":
             db_game.winner_id = None  # AI doesn't have an ID
     
-    await db.commit()
-    
-    # Broadcast updated state
-    game_state = get_game_state(ugolki, db_game)
-    await broadcast_to_game(game_id, "game_state", game_state)
+    # Broadcast updated state; the relay tasks deliver it while we commit
+    game_state = get_game_state(ugolki, db_game, board=board)
+    broadcast_to_game(game_id, "game_state", game_state)
     
-    if step_result.done:
-        await broadcast_to_game(game_id, "game_over", {
-            "winner": step_result.info.get("winner"),
+    if winner is not None:
+        broadcast_to_game(game_id, "game_over", {
+            "winner": winner,
             "winner_id": db_game.winner_id,
         })
+    
+    await commit_move(db, game_id)
 
 
 async def update_elo_after_game(db: AsyncSession, game: Game, winner: str) -> None:
@@ -345,51 +535,50 @@ async def update_elo_after_game(db: AsyncSession, game: Game, winner: str) -> No
         white_player.elo, black_player.elo, white_won
     )
     
-    # Update players
+    # Update players; the caller commits these with the game row
     white_player.elo = new_white_elo
     black_player.elo = new_black_elo
-    await db.commit()
 
 
 async def handle_get_open_games(
-    websocket: WebSocket,
-    user: User,
+    channel: Channel,
+    user_id: int,
+    data: dict[str, Any],
     db: AsyncSession,
 ) -> None:
     """Get list of open games waiting for players."""
+    # Fetch each game together with its creator in a single query
     result = await db.execute(
-        select(Game)
+        select(Game.id, Game.created_at, User.username, User.elo)
+        .join(User, Game.white_player_id == User.id)
         .where(Game.status == "waiting")
         .where(Game.game_type == "pvp")
-        .where(Game.white_player_id != user.id)
+        .where(Game.white_player_id != user_id)
     )
-    games = result.scalars().all()
-    
-    open_games = []
-    for game in games:
-        # Get creator username
-        creator_result = await db.execute(select(User).where(User.id == game.white_player_id))
-        creator = creator_result.scalar_one_or_none()
-        open_games.append({
-            "game_id": game.id,
-            "creator": creator.username if creator else "Unknown",
-            "creator_elo": creator.elo if creator else 1200,
-            "created_at": game.created_at.isoformat(),
-        })
     
-    await send_message(websocket, "open_games", {"games": open_games})
+    open_games = [
+        {
+            "game_id": row.id,
+            "creator": row.username,
+            "creator_elo": row.elo,
+            "created_at": row.created_at.isoformat(),
+        }
+        for row in result.all()
+    ]
+    
+    send_message(channel, "open_games", {"games": open_games})
 
 
 async def handle_reconnect(
-    websocket: WebSocket,
-    user: User,
+    channel: Channel,
+    user_id: int,
     data: dict[str, Any],
     db: AsyncSession,
 ) -> None:
     """Handle reconnecting to an active game."""
     game_id = data.get("game_id")
     if game_id is None:
-        await send_message(websocket, "error", {"message": "game_id required"})
+        send_message(channel, "error", {"message": "game_id required"})
         return
     
     # Get game from database
@@ -397,82 +586,86 @@ async def handle_reconnect(
     db_game = result.scalar_one_or_none()
     
     if db_game is None:
-        await send_message(websocket, "error", {"message": "Game not found"})
+        send_message(channel, "error", {"message": "Game not found"})
         return
     
     # Check user is part of this game
-    if user.id != db_game.white_player_id and user.id != db_game.black_player_id:
-        await send_message(websocket, "error", {"message": "Not part of this game"})
+    if user_id != db_game.white_player_id and user_id != db_game.black_player_id:
+        send_message(channel, "error", {"message": "Not part of this game"})
         return
     
     # Restore game instance if needed
     if game_id not in active_games:
-        import torch
-        board_list = json.loads(db_game.board_state)
-        board = torch.tensor(board_list, dtype=torch.long)
-        ugolki = Ugolki(board)
-        ugolki.turn = db_game.current_turn
-        active_games[game_id] = ugolki
+        active_games[game_id] = restore_game(db_game)
     
     ugolki = active_games[game_id]
     
     # Store connection
     if game_id not in active_connections:
         active_connections[game_id] = {}
-    active_connections[game_id][user.id] = websocket
+    active_connections[game_id][user_id] = channel
     
     # Send current state
-    await send_message(websocket, "game_state", get_game_state(ugolki, db_game))
+    send_message(channel, "game_state", get_game_state(ugolki, db_game))
+
+
+# Message type -> handler. Each handled message gets its own database session.
+MESSAGE_HANDLERS = {
+    "create_game": handle_create_game,
+    "join_game": handle_join_game,
+    "move": handle_move,
+    "get_open_games": handle_get_open_games,
+    "reconnect": handle_reconnect,
+}
 
 
 async def websocket_handler(websocket: WebSocket, token: str) -> None:
     """Main WebSocket handler."""
     await websocket.accept()
+    channel = Channel(websocket)
+    channel.relay_task = asyncio.create_task(relay(channel))
     
-    # Validate token and get user
-    async with async_session_maker() as db:
-        user = await get_user_from_token(token, db)
-        
-        if user is None:
-            await send_message(websocket, "error", {"message": "Invalid token"})
-            await websocket.close()
-            return
-        
-        await send_message(websocket, "connected", {"user_id": user.id, "username": user.username})
-        
-        try:
-            while True:
-                data = await websocket.receive_json()
-                msg_type = data.get("type")
-                msg_data = data.get("data", {})
-                
-                # Create new session for each message
-                async with async_session_maker() as msg_db:
-                    # Re-fetch user to ensure fresh data
-                    user = await get_user_from_token(token, msg_db)
-                    if user is None:
-                        await send_message(websocket, "error", {"message": "Session expired"})
-                        break
-                    
-                    if msg_type == "create_game":
-                        await handle_create_game(websocket, user, msg_data, msg_db)
-                    elif msg_type == "join_game":
-                        await handle_join_game(websocket, user, msg_data, msg_db)
-                    elif msg_type == "move":
-                        await handle_move(websocket, user, msg_data, msg_db)
-                    elif msg_type == "get_open_games":
-                        await handle_get_open_games(websocket, user, msg_db)
-                    elif msg_type == "reconnect":
-                        await handle_reconnect(websocket, user, msg_data, msg_db)
-                    else:
-                        await send_message(websocket, "error", {"message": f"Unknown message type: {msg_type}"})
-        
-        except WebSocketDisconnect:
-            # Clean up connections
-            for game_id, connections in list(active_connections.items()):
-                if user.id in connections:
-                    del connections[user.id]
-                    # Notify other player
-                    await broadcast_to_game(game_id, "opponent_disconnected", {"user_id": user.id})
-                if not connections:
-                    del active_connections[game_id]
+    # Validate token once; later messages only check that it hasn't expired
+    user = await get_user_from_token(token)
+    
+    if user is None:
+        send_message(channel, "error", {"message": "Invalid token"})
+        await flush(channel)
+        channel.relay_task.cancel()
+        await websocket.close()
+        return
+    
+    user_id = user.user_id
+    send_message(channel, "connected", {"user_id": user_id, "username": user.username})
+    
+    try:
+        while True:
+            data = await websocket.receive_json()
+            msg_type = data.get("type")
+            msg_data = data.get("data", {})
+            
+            if time.time() >= user.expires_at:
+                send_message(channel, "error", {"message": "Session expired"})
+                await flush(channel)
+                break
+            
+            handler = MESSAGE_HANDLERS.get(msg_type)
+            if handler is None:
+                send_message(channel, "error", {"message": f"Unknown message type: {msg_type}"})
+                continue
+            
+            async with async_session_maker() as msg_db:
+                await handler(channel, user_id, msg_data, msg_db)
+    
+    except WebSocketDisconnect:
+        # Clean up connections
+        for game_id, connections in list(active_connections.items()):
+            if user_id in connections:
+                del connections[user_id]
+                # Notify other player
+                broadcast_to_game(game_id, "opponent_disconnected", {"user_id": user_id})
+            if not connections:
+                del active_connections[game_id]
+    
+    finally:
+        channel.relay_task.cancel()
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models.database import User, Game, get_db
@@ -36,38 +36,46 @@ async def get_leaderboard(
     count_result = await db.execute(select(func.count()).select_from(User))
     total = count_result.scalar() or 0
     
+    # Count completed games per player (as white or black) in one grouped
+    # subquery rather than one COUNT per user
+    completed = Game.status == "completed"
+    games_per_side = (
+        select(Game.white_player_id.label("user_id"), func.count().label("games"))
+        .where(completed)
+        .group_by(Game.white_player_id)
+        .union_all(
+            select(Game.black_player_id, func.count())
+            .where(completed)
+            .group_by(Game.black_player_id)
+        )
+        .subquery()
+    )
+    games_played = (
+        select(
+            games_per_side.c.user_id,
+            func.sum(games_per_side.c.games).label("games"),
+        )
+        .group_by(games_per_side.c.user_id)
+        .subquery()
+    )
+    
     # Get paginated results sorted by ELO
     result = await db.execute(
-        select(User)
+        select(User, func.coalesce(games_played.c.games, 0))
+        .outerjoin(games_played, games_played.c.user_id == User.id)
         .order_by(User.elo.desc())
         .offset(offset)
         .limit(limit)
     )
-    users = result.scalars().all()
     
-    entries = []
-    for i, user in enumerate(users):
-        # Count completed games only (not waiting/active/abandoned games)
-        games_result = await db.execute(
-            select(func.count())
-            .select_from(Game)
-            .where(Game.status == "completed")
-            .where(
-                or_(
-                    Game.white_player_id == user.id,
-                    Game.black_player_id == user.id
-                )
-            )
-        )
-        games_count = games_result.scalar() or 0
-        
-        entries.append(
-            LeaderboardEntry(
-                rank=offset + i + 1,
-                username=user.username,
-                elo=user.elo,
-                games_played=games_count,
-            )
+    entries = [
+        LeaderboardEntry(
+            rank=offset + i + 1,
+            username=user.username,
+            elo=user.elo,
+            games_played=games_count,
         )
+        for i, (user, games_count) in enumerate(result.all())
+    ]
     
     return LeaderboardResponse(entries=entries, total=total)
@@ -1,10 +1,11 @@
-import json
 from datetime import datetime
 from typing import AsyncGenerator
 
-from sqlalchemy import String, Integer, Float, DateTime, Text, ForeignKey, create_engine
+import numpy as np
+from sqlalchemy import String, Integer, Float, DateTime, LargeBinary, ForeignKey, Index, create_engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.pool import StaticPool
 
 
 class Base(DeclarativeBase):
@@ -18,7 +19,7 @@ class User(Base):
     username: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
-    elo: Mapped[float] = mapped_column(Float, default=1200.0)
+    elo: Mapped[float] = mapped_column(Float, default=1200.0, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     # Relationships
@@ -32,24 +33,30 @@ class User(Base):
 
 class Game(Base):
     __tablename__ = "games"
+    __table_args__ = (
+        # Open-game lookup filters on both columns
+        Index("ix_games_open", "status", "game_type"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     white_player_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("users.id"), nullable=False
+        Integer, ForeignKey("users.id"), nullable=False, index=True
     )
     black_player_id: Mapped[int | None] = mapped_column(
-        Integer, ForeignKey("users.id"), nullable=True
+        Integer, ForeignKey("users.id"), nullable=True, index=True
     )  # None for AI games or waiting for opponent
     game_type: Mapped[str] = mapped_column(
-        String(10), nullable=False
+        String(10), nullable=False, index=True
     )  # "ai" or "pvp"
     status: Mapped[str] = mapped_column(
-        String(20), default="waiting"
+        String(20), default="waiting", index=True
     )  # "waiting", "active", "completed"
     winner_id: Mapped[int | None] = mapped_column(
         Integer, ForeignKey("users.id"), nullable=True
     )
-    board_state: Mapped[str] = mapped_column(Text, nullable=False)  # JSON serialized board
+    board_state: Mapped[bytes] = mapped_column(
+        LargeBinary, nullable=False
+    )  # 64 int8 cells, row-major
     current_turn: Mapped[str] = mapped_column(String(10), default="white")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
@@ -63,26 +70,61 @@ class Game(Base):
     )
 
     def get_board_as_list(self) -> list[list[int]]:
-        """Deserialize board state from JSON."""
-        return json.loads(self.board_state)
+        """Deserialize board state from its int8 bytes."""
+        return np.frombuffer(self.board_state, dtype=np.int8).reshape(8, 8).tolist()
 
     def set_board_from_list(self, board: list[list[int]]) -> None:
-        """Serialize board state to JSON."""
-        self.board_state = json.dumps(board)
+        """Serialize board state to int8 bytes."""
+        self.board_state = self.encode_board(board)
+
+    @staticmethod
+    def encode_board(board: list[list[int]]) -> bytes:
+        """Encode a board as the int8 bytes stored in `board_state`."""
+        return np.asarray(board, dtype=np.int8).tobytes()
 
 
 # Database setup
 import os
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite+aiosqlite:///./ugolki.db")
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "15"))
+
+
+def engine_options(url: str) -> dict:
+    """Connection pool settings for the given database URL."""
+    if ":memory:" in url:
+        # An in-memory SQLite database lives in a single connection, so every
+        # session must share it rather than draw fresh (empty) ones from a pool.
+        return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+    }
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+engine = create_async_engine(DATABASE_URL, echo=False, **engine_options(DATABASE_URL))
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+def create_indexes(connection) -> None:
+    """Create any missing indexes; create_all skips them on tables that already exist."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
 async def init_db() -> None:
     """Initialize database tables."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_indexes)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
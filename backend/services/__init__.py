@@ -2,6 +2,8 @@ from backend.services.elo import calculate_elo_change
 from backend.services.auth import (
     hash_password,
     verify_password,
+    ahash_password,
+    averify_password,
     create_access_token,
     decode_token,
 )
@@ -10,6 +12,8 @@ __all__ = [
     "calculate_elo_change",
     "hash_password",
     "verify_password",
+    "ahash_password",
+    "averify_password",
     "create_access_token",
     "decode_token",
 ]
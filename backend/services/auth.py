@@ -1,5 +1,6 @@
 """Authentication service using JWT tokens."""
 
+import asyncio
 import os
 from datetime import datetime, timedelta
 from typing import Any
@@ -11,12 +12,13 @@ from jose import JWTError, jwt
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "ugolki-dev-secret-key-not-for-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 1 week
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))  # Cost factor for new hashes
 
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt."""
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
@@ -28,6 +30,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+async def ahash_password(password: str) -> str:
+    """Hash a password in a worker thread, so bcrypt doesn't block the event loop."""
+    return await asyncio.to_thread(hash_password, password)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in a worker thread, so bcrypt doesn't block the event loop."""
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -105,34 +105,38 @@ export function useGameSocket(token: string | null, handlers: MessageHandler) {
 
     ws.onmessage = (event) => {
       const message = JSON.parse(event.data);
-      const { type, data } = message;
-      console.log('WebSocket message:', type, data);
-
-      switch (type) {
-        case 'connected':
-          handlersRef.current.onConnected?.(data);
-          break;
-        case 'game_created':
-          handlersRef.current.onGameCreated?.(data);
-          break;
-        case 'game_started':
-          handlersRef.current.onGameStarted?.(data);
-          break;
-        case 'game_state':
-          handlersRef.current.onGameState?.(data);
-          break;
-        case 'game_over':
-          handlersRef.current.onGameOver?.(data);
-          break;
-        case 'open_games':
-          handlersRef.current.onOpenGames?.(data);
-          break;
-        case 'opponent_disconnected':
-          handlersRef.current.onOpponentDisconnected?.();
-          break;
-        case 'error':
-          handlersRef.current.onError?.(data.message);
-          break;
+      // The server sends messages queued together as a single batch frame
+      const messages = message.type === 'batch' ? message.msgs : [message];
+
+      for (const { type, data } of messages) {
+        console.log('WebSocket message:', type, data);
+
+        switch (type) {
+          case 'connected':
+            handlersRef.current.onConnected?.(data);
+            break;
+          case 'game_created':
+            handlersRef.current.onGameCreated?.(data);
+            break;
+          case 'game_started':
+            handlersRef.current.onGameStarted?.(data);
+            break;
+          case 'game_state':
+            handlersRef.current.onGameState?.(data);
+            break;
+          case 'game_over':
+            handlersRef.current.onGameOver?.(data);
+            break;
+          case 'open_games':
+            handlersRef.current.onOpenGames?.(data);
+            break;
+          case 'opponent_disconnected':
+            handlersRef.current.onOpponentDisconnected?.();
+            break;
+          case 'error':
+            handlersRef.current.onError?.(data.message);
+            break;
+        }
       }
     };
   }, []);
@@ -17,8 +17,15 @@ class RandomAgent(Agent):
         pass
 
     def select_action(self, game: Game) -> Action:
-        """Select a random legal action."""
-        actions = game.get_legal_actions()
-        if not actions:
+        """Select a random legal action.
+
+        Uses reservoir sampling so the actions are drawn uniformly in a single
+        pass without materializing them as a list.
+        """
+        chosen = None
+        for n, action in enumerate(game.get_legal_actions_iter(), start=1):
+            if random.random() * n < 1:
+                chosen = action
+        if chosen is None:
             raise ValueError("No legal actions available")
-        return random.choice(actions)
+        return chosen
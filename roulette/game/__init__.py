@@ -1,4 +1,4 @@
 from roulette.game.base import Action, Game, Position, StepResult, Transition
-from roulette.game.ugolki import Player, Ugolki
+from roulette.game.ugolki import Player, Ugolki, VecUgolki
 
-__all__ = ["Action", "Game", "Player", "Position", "StepResult", "Transition", "Ugolki"]
+__all__ = ["Action", "Game", "Player", "Position", "StepResult", "Transition", "Ugolki", "VecUgolki"]
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from dataclasses import dataclass
 from typing import Any
 
@@ -41,6 +42,10 @@ class Game(ABC):
     def get_legal_actions(self) -> list[Action]:
         pass
 
+    def get_legal_actions_iter(self) -> Iterator[Action]:
+        """Iterate over legal actions; games can override this to avoid building a list."""
+        return iter(self.get_legal_actions())
+
     @abstractmethod
     def step(self, action: Action) -> StepResult:
         pass
@@ -1,12 +1,25 @@
-import random
+from collections.abc import Iterator
 from enum import StrEnum
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-import torch
+import numpy as np
 
 from roulette.game.base import Action, Game, StepResult
 
-# Directions: North, East, South, West
-DIRECTIONS = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+if TYPE_CHECKING:
+    # torch is an optional extra; it is imported only when a tensor is requested
+    import torch
+
+# Bitboards: bit (row * 8 + col) is set when that square holds a piece
+WHITE_CORNER = 0x0000_0000_0F0F_0F0F  # rows 0-3, cols 0-3
+BLACK_CORNER = 0xF0F0_F0F0_0000_0000  # rows 4-7, cols 4-7
+# Each side starts in its own corner and wins by filling the other one
+START_WHITE_BB = WHITE_CORNER
+START_BLACK_BB = BLACK_CORNER
+MASK64 = (1 << 64) - 1
+NOT_A_FILE = 0xFEFE_FEFE_FEFE_FEFE  # every square except column 0
+NOT_H_FILE = 0x7F7F_7F7F_7F7F_7F7F  # every square except column 7
 
 
 class Player(StrEnum):
@@ -14,18 +27,171 @@ class Player(StrEnum):
     BLACK = "black"
 
 
+def _north(bb: int) -> int:
+    """Shift every piece one row up."""
+    return bb >> 8
+
+
+def _south(bb: int) -> int:
+    """Shift every piece one row down."""
+    return (bb << 8) & MASK64
+
+
+def _east(bb: int) -> int:
+    """Shift every piece one column right, dropping those that would wrap."""
+    return (bb << 1) & NOT_A_FILE
+
+
+def _west(bb: int) -> int:
+    """Shift every piece one column left, dropping those that would wrap."""
+    return (bb >> 1) & NOT_H_FILE
+
+
+# SQUARES[square] is the shared (row, col) tuple for that square index
+SQUARES = [divmod(square, 8) for square in range(64)]
+
+# ACTIONS[from_square][to_square] is the shared action tuple for that move, so
+# cached action lists hold references rather than fresh tuples
+ACTIONS = [[(SQUARES[src], SQUARES[dst]) for dst in range(64)] for src in range(64)]
+
+
+def _board_to_bitboards(board) -> tuple[int, int]:
+    """Convert an 8x8 board (1 white, -1 black, 0 empty) to (white, black) bitboards."""
+    # Pack each side's 64 cells into 8 bytes, square 0 in the lowest bit
+    cells = np.asarray(board).reshape(64)
+    white_bytes = np.packbits(cells == 1, bitorder="little").tobytes()
+    black_bytes = np.packbits(cells == -1, bitorder="little").tobytes()
+    return int.from_bytes(white_bytes, "little"), int.from_bytes(black_bytes, "little")
+
+
+def _bitboards_to_cells(white: np.ndarray, black: np.ndarray) -> np.ndarray:
+    """Unpack (n,) white/black bitboards to (n, 8, 8) int64 boards (1 white, -1 black, 0 empty)."""
+    bitboards = np.stack([white, black], axis=1).astype("<u8")
+    bits = np.unpackbits(bitboards.view(np.uint8), axis=1, bitorder="little")
+    bits = bits.reshape(len(bitboards), 2, 64)
+    cells = bits[:, 0].astype(np.int64) - bits[:, 1]
+    return cells.reshape(-1, 8, 8)
+
+
+def _legal_moves_core(own: int, occupied: int) -> list[tuple[int, int]]:
+    """
+    Every legal move of the player owning `own` as (from_square, to_square) pairs.
+
+    Pure integer kernel: it takes and returns only ints, so converting squares
+    to (row, col) positions is left to the caller.
+
+    Args:
+        own: Bitboard of the moving player's pieces.
+        occupied: Bitboard of all pieces on the board.
+    """
+    empty = ~occupied & MASK64
+    moves = []
+
+    # 1. Simple steps (move by one): one shift per direction moves every piece
+    # at once; the file masks drop moves that would wrap around an edge.
+    # Each entry is (targets, square offset from source to target).
+    for targets, offset in (
+        (_north(own) & empty, -8),
+        (_east(own) & empty, 1),
+        (_south(own) & empty, 8),
+        (_west(own) & empty, -1),
+    ):
+        while targets:
+            lowest = targets & -targets
+            targets ^= lowest
+            to_square = lowest.bit_length() - 1
+            moves.append((to_square - offset, to_square))
+
+    # 2. Jumps (BFS to find all reachable via chain jumps)
+    pieces = own
+    while pieces:
+        lowest = pieces & -pieces
+        pieces ^= lowest
+        start = lowest.bit_length() - 1
+        landings = _jump_landings(occupied, start)
+        while landings:
+            land_bit = landings & -landings
+            landings ^= land_bit
+            moves.append((start, land_bit.bit_length() - 1))
+
+    return moves
+
+
+def _jump_landings(occupied: int, start: int) -> int:
+    """
+    BFS to find the bitboard of all squares reachable from `start` via chain jumps.
+
+    The frontier is a bitboard of every square reached by the previous jump, so
+    each BFS level jumps from all of them at once: shift onto an occupied
+    neighbour, then shift again onto an empty square not seen before.
+    """
+    empty = ~occupied & MASK64
+    visited = frontier = 1 << start  # Don't revisit starting position
+
+    while frontier:
+        frontier = (
+            _north(_north(frontier) & occupied)
+            | _east(_east(frontier) & occupied)
+            | _south(_south(frontier) & occupied)
+            | _west(_west(frontier) & occupied)
+        ) & empty & ~visited
+        visited |= frontier  # Continue chain from the new landings
+
+    # Every visited square except the start is a landing
+    return visited ^ (1 << start)
+
+
+@lru_cache(maxsize=1 << 16)
+def _legal_actions_for(
+    white_bb: int, black_bb: int, turn_is_white: bool
+) -> tuple[Action, ...]:
+    """
+    All legal actions in a position, memoized across games.
+
+    Random play and search revisit the same positions often, so movegen is keyed
+    by the position itself rather than by the game object.
+    """
+    own = white_bb if turn_is_white else black_bb
+    return tuple(
+        ACTIONS[from_square][to_square]
+        for from_square, to_square in _legal_moves_core(own, white_bb | black_bb)
+    )
+
+
+# Every new game starts here, so its actions are computed once at import
+START_ACTIONS = _legal_actions_for(START_WHITE_BB, START_BLACK_BB, True)
+
+
 class Ugolki(Game):
-    def __init__(self, board: torch.Tensor) -> None:
+    def __init__(self, board: "torch.Tensor | np.ndarray | None" = None) -> None:
+        """
+        Args:
+            board: 8x8 tensor or array (1 white, -1 black, 0 empty). Defaults to
+                the starting position.
+        """
         super().__init__()
-        self.board = board
+        # The position is held as two bitboards; `board` is derived from them
+        if board is None:
+            self.white_bb, self.black_bb = START_WHITE_BB, START_BLACK_BB
+        else:
+            self.white_bb, self.black_bb = _board_to_bitboards(board)
+        self._count_corner_pieces()
         self.score_white = 0
         self.score_black = 0
-        self.turn = Player.WHITE
+        self.turn_is_white = True
+        # (actions tuple it was built from, set of the same actions)
+        self._legal_set_cache: tuple[tuple[Action, ...], frozenset[Action]] | None = None
+
+    def _count_corner_pieces(self) -> None:
+        """Recount how many pieces each side has in the opponent's corner."""
+        # Kept up to date by apply_action, so the win check is two int compares
+        self.white_in_bc = (self.white_bb & BLACK_CORNER).bit_count()
+        self.black_in_wc = (self.black_bb & WHITE_CORNER).bit_count()
 
     def update_score(self, action: Action) -> None:
         (from_row, from_col), (to_row, to_col) = action
         delta = (to_row - from_row) + (to_col - from_col)
-        if self.turn == Player.WHITE:
+        if self.turn_is_white:
             self.score_white += delta
         else:
             self.score_black -= delta
@@ -34,74 +200,149 @@ class Ugolki(Game):
         """Print the current board state to terminal."""
         symbols = {0: "·", 1: "W", -1: "B"}
 
+        # One bulk conversion instead of a lookup per cell
+        grid = self.to_array().tolist()
+
         print("    " + "   ".join(str(i) for i in range(8)))
         print("  +" + "---+" * 8)
 
         for row in range(8):
-            row_str = " | ".join(
-                symbols[int(self.board[row, col].item())] for col in range(8)
-            )
+            row_str = " | ".join(symbols[cell] for cell in grid[row])
             print(f"{row} | {row_str} |")
             print("  +" + "---+" * 8)
 
         print(f"\nTurn: {self.turn}")
 
+    @property
+    def board(self) -> "torch.Tensor":
+        """The board as an 8x8 long tensor (1 white, -1 black, 0 empty)."""
+        return self._to_tensor()
+
+    def to_array(self) -> np.ndarray:
+        """The board as an 8x8 int64 array (1 white, -1 black, 0 empty), without torch."""
+        white = np.array([self.white_bb], dtype=np.uint64)
+        black = np.array([self.black_bb], dtype=np.uint64)
+        return _bitboards_to_cells(white, black)[0]
+
+    def _to_tensor(self) -> "torch.Tensor":
+        """Materialize the bitboards as a fresh 8x8 long tensor."""
+        import torch
+
+        return torch.from_numpy(self.to_array())
+
+    @property
+    def turn(self) -> Player:
+        """The side to move; stored as the `turn_is_white` flag."""
+        return Player.WHITE if self.turn_is_white else Player.BLACK
+
+    @turn.setter
+    def turn(self, player: str) -> None:
+        # Player() raises ValueError for anything but "white"/"black"
+        self.turn_is_white = Player(player) == Player.WHITE
+
     @property
     def current_player(self) -> Player:
         return self.turn
 
-    def reset(self) -> torch.Tensor:
+    def reset(self) -> "torch.Tensor":
         """Reset to starting position and return the initial board."""
-        self.board = torch.zeros((8, 8), dtype=torch.long)
-        self.board[:4, :4] = 1
-        self.board[4:, 4:] = -1
+        self.white_bb = START_WHITE_BB
+        self.black_bb = START_BLACK_BB
+        self._count_corner_pieces()
         self.score_white = 0
         self.score_black = 0
-        self.turn = Player.WHITE
+        self.turn_is_white = True
         return self.board
 
     @classmethod
     def create_game(cls):
         """Create a new game at starting position."""
-        board = torch.zeros((8, 8), dtype=torch.long)
-        # set white pieces as 1
-        board[:4, :4] = 1
-        # set black pieces as -1
-        board[4:, 4:] = -1
+        return cls()
 
-        return cls(board)
+    @classmethod
+    def from_bitboards(
+        cls, white_bb: int, black_bb: int, turn_is_white: bool = True
+    ) -> "Ugolki":
+        """Create a game at the position given by two bitboards."""
+        game = cls()
+        game.white_bb, game.black_bb = white_bb, black_bb
+        game._count_corner_pieces()
+        game.turn_is_white = turn_is_white
+        return game
 
     @classmethod
-    def create_random_game(cls, num_moves: int | None = None):
+    def create_random_game(
+        cls, num_moves: int | None = None, rng: np.random.Generator | None = None
+    ):
         """
         Create a game at a random position by playing random moves.
 
         Args:
             num_moves: Number of random moves to play. If None, picks random 0-50.
+            rng: Random generator to draw from; a fresh one is created if None.
         """
-        game = cls.create_game()
-
+        if rng is None:
+            rng = np.random.default_rng()
         if num_moves is None:
-            num_moves = random.randint(0, 50)
+            num_moves = int(rng.integers(0, 51))
+
+        return cls._play_random_moves(rng.random(num_moves).tolist())
+
+    @classmethod
+    def create_random_games(
+        cls, batch: int, num_moves: int, rng: np.random.Generator | None = None
+    ) -> list["Ugolki"]:
+        """
+        Create `batch` games, each advanced by `num_moves` random moves.
+
+        All random draws for the batch are made up front in a single call.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        draws = rng.random((batch, num_moves)).tolist()
+        return [cls._play_random_moves(game_draws) for game_draws in draws]
+
+    @classmethod
+    def _play_random_moves(cls, draws: list[float]) -> "Ugolki":
+        """Play one move per uniform draw in [0, 1) from the starting position."""
+        game = cls.create_game()
 
-        for _ in range(num_moves):
-            actions = game.get_legal_actions()
+        for draw in draws:
+            actions = game._cached_legal_actions()
             if not actions:
                 break
-            action = random.choice(actions)
-            game.apply_action(action)
+            game.apply_action(actions[int(draw * len(actions))])
 
         return game
 
-    def apply_action(self, action: Action) -> None:
-        """Apply an action to the board (no validation, no return)."""
+    def apply_action(self, action: Action | tuple[int, int]) -> None:
+        """
+        Apply an action to the board (no validation, no return).
+
+        Accepts ((from_row, from_col), (to_row, to_col)) or a packed
+        (from_square, to_square) pair as returned by get_legal_actions_packed.
+        """
+        from_pos, to_pos = action
+        if isinstance(from_pos, (int, np.integer)):
+            action = ACTIONS[from_pos][to_pos]
         (from_row, from_col), (to_row, to_col) = action
-        # Move piece
-        self.board[to_row, to_col] = self.board[from_row, from_col]
-        self.board[from_row, from_col] = 0
+        # Move piece: flipping both squares on the mover's bitboard clears the
+        # source and sets the (empty) destination. Only the mover's corner count
+        # can change, and only if the move touches that corner; it is recounted
+        # from the bitboard rather than adjusted, so it stays exact even for an
+        # unvalidated move onto an occupied square.
+        move_mask = (1 << (from_row * 8 + from_col)) | (1 << (to_row * 8 + to_col))
+        if self.turn_is_white:
+            self.white_bb ^= move_mask
+            if move_mask & BLACK_CORNER:
+                self.white_in_bc = (self.white_bb & BLACK_CORNER).bit_count()
+        else:
+            self.black_bb ^= move_mask
+            if move_mask & WHITE_CORNER:
+                self.black_in_wc = (self.black_bb & WHITE_CORNER).bit_count()
         self.update_score(action)
         # Switch turn
-        self.turn = Player.BLACK if self.turn == Player.WHITE else Player.WHITE
+        self.turn_is_white = not self.turn_is_white
 
     def get_legal_actions(self) -> list[Action]:
         """
@@ -110,64 +351,44 @@ class Ugolki(Game):
         Legal actions:
         - move by one to a free adjacent field
         - jump 1 to n times over another piece if the field is free (only NESW not diagonal)
+
+        Positions are memoized in a module-wide LRU cache, so repeated
+        positions (within or across games) skip move generation.
+        """
+        return list(self._cached_legal_actions())
+
+    def get_legal_actions_iter(self) -> Iterator[Action]:
+        """Iterate over legal actions without copying them into a list."""
+        return iter(self._cached_legal_actions())
+
+    def get_legal_actions_packed(self) -> np.ndarray:
         """
-        actions = []
-        piece_value = 1 if self.turn == Player.WHITE else -1
-
-        # Find all pieces of current player
-        piece_positions = torch.where(self.board == piece_value)
-        pieces = list(zip(piece_positions[0].tolist(), piece_positions[1].tolist()))
-
-        for row, col in pieces:
-            # 1. Simple steps (move by one)
-            for dr, dc in DIRECTIONS:
-                new_row, new_col = row + dr, col + dc
-                if (
-                    self._is_valid(new_row, new_col)
-                    and self.board[new_row, new_col] == 0
-                ):
-                    actions.append(((row, col), (new_row, new_col)))
-
-            # 2. Jumps (BFS to find all reachable via chain jumps)
-            jump_destinations = self._get_jump_destinations(row, col)
-            for dest in jump_destinations:
-                actions.append(((row, col), dest))
-
-        return actions
-
-    def _is_valid(self, row: int, col: int) -> bool:
-        """Check if position is within board bounds."""
-        return 0 <= row < 8 and 0 <= col < 8
-
-    def _get_jump_destinations(
-        self, start_row: int, start_col: int
-    ) -> set[tuple[int, int]]:
-        """BFS to find all positions reachable via chain jumps."""
-        reachable = set()
-        visited = {(start_row, start_col)}  # Don't revisit starting position
-        queue = [(start_row, start_col)]
-
-        while queue:
-            row, col = queue.pop(0)
-
-            for dr, dc in DIRECTIONS:
-                # Position of piece to jump over
-                mid_row, mid_col = row + dr, col + dc
-                # Landing position (2 squares away)
-                land_row, land_col = row + 2 * dr, col + 2 * dc
-
-                if (
-                    self._is_valid(land_row, land_col)
-                    and self._is_valid(mid_row, mid_col)
-                    and self.board[mid_row, mid_col] != 0  # Must jump over a piece
-                    and self.board[land_row, land_col] == 0  # Landing must be empty
-                    and (land_row, land_col) not in visited
-                ):
-                    visited.add((land_row, land_col))
-                    reachable.add((land_row, land_col))
-                    queue.append((land_row, land_col))  # Continue chain from here
-
-        return reachable
+        Legal actions as an (N, 2) int16 array of (from_square, to_square) pairs,
+        where square = row * 8 + col. Rows can be passed to apply_action or step.
+        """
+        own = self.white_bb if self.turn_is_white else self.black_bb
+        moves = _legal_moves_core(own, self.white_bb | self.black_bb)
+        return np.array(moves, dtype=np.int16).reshape(-1, 2)
+
+    def get_legal_action_set(self) -> frozenset[Action]:
+        """Legal actions as a frozenset, for constant-time membership tests."""
+        actions = self._cached_legal_actions()
+        # Rebuilt only when the position's cached actions changed
+        if self._legal_set_cache is None or self._legal_set_cache[0] is not actions:
+            self._legal_set_cache = (actions, frozenset(actions))
+        return self._legal_set_cache[1]
+
+    def _cached_legal_actions(self) -> tuple[Action, ...]:
+        """Legal actions for the current position, from the shared cache."""
+        if (
+            self.turn_is_white
+            and self.white_bb == START_WHITE_BB
+            and self.black_bb == START_BLACK_BB
+        ):
+            return START_ACTIONS
+        return _legal_actions_for(
+            self.white_bb, self.black_bb, self.turn_is_white
+        )
 
     def _check_winner(self) -> str | None:
         """
@@ -180,19 +401,26 @@ class Ugolki(Game):
         Returns:
             "white" if white wins, "black" if black wins, None if no winner yet.
         """
-        # Check if white won: all white pieces (1) must be in rows 4-7, cols 4-7
-        white_in_black_corner = (self.board[4:, 4:] == 1).sum().item()
-        if white_in_black_corner == 16:
+        # Check if white won: all white pieces must be in rows 4-7, cols 4-7
+        if self.white_in_bc == 16:
             return Player.WHITE
 
-        # Check if black won: all black pieces (-1) must be in rows 0-3, cols 0-3
-        black_in_white_corner = (self.board[:4, :4] == -1).sum().item()
-        if black_in_white_corner == 16:
+        # Check if black won: all black pieces must be in rows 0-3, cols 0-3
+        if self.black_in_wc == 16:
             return Player.BLACK
 
         return None
 
-    def step(self, action: Action) -> StepResult:
+    def play(self, action: Action | tuple[int, int]) -> Player | None:
+        """
+        Apply an action and return the winner, if any.
+
+        Unlike step, this builds no state tensor, so it works without torch.
+        """
+        self.apply_action(action)
+        return self._check_winner()
+
+    def step(self, action: Action | tuple[int, int]) -> StepResult:
         """
         Apply action and return (state, reward, done, info).
 
@@ -203,27 +431,115 @@ class Ugolki(Game):
             info: Dict with extra info (includes 'winner' if game is done)
         """
         # Track who made the move (before turn switches)
-        moving_player = self.turn
-
-        self.apply_action(action)
+        moving_is_white = self.turn_is_white
 
-        # Check win conditions
-        winner = self._check_winner()
+        winner = self.play(action)
         done = winner is not None
         info = {}
 
         if done:
             info["winner"] = winner
             # Reward from perspective of the player who just moved
-            if winner == moving_player:
+            if (winner == Player.WHITE) == moving_is_white:
                 reward = 10.0
             else:
                 reward = -10.0
         else:
             reward = 0.0
 
-        return StepResult(state=self.board, reward=reward, done=done, info=info)
+        return StepResult(state=self._to_tensor(), reward=reward, done=done, info=info)
 
     def save_game(self):
         # TODO implement this
         return
+
+
+class VecUgolki:
+    """
+    `n_envs` Ugolki games stepped together on numpy uint64 bitboards.
+
+    Actions are packed (from_square, to_square) rows, as returned by
+    Ugolki.get_legal_actions_packed. Single-step targets are generated for the
+    whole batch at once; chain jumps need per-game BFS, so full legal action
+    lists come from `game(i)`.
+    """
+
+    def __init__(self, n_envs: int) -> None:
+        self.n_envs = n_envs
+        self.white_bb = np.full(n_envs, START_WHITE_BB, dtype=np.uint64)
+        self.black_bb = np.full(n_envs, START_BLACK_BB, dtype=np.uint64)
+        self.turn_is_white = np.ones(n_envs, dtype=bool)
+
+    def reset(self, mask: np.ndarray | None = None) -> None:
+        """Reset every game, or only those where `mask` is True, to the start."""
+        if mask is None:
+            mask = np.ones(self.n_envs, dtype=bool)
+        self.white_bb[mask] = START_WHITE_BB
+        self.black_bb[mask] = START_BLACK_BB
+        self.turn_is_white[mask] = True
+
+    def game(self, i: int) -> Ugolki:
+        """A standalone Ugolki copy of game `i`, for move generation or debugging."""
+        return Ugolki.from_bitboards(
+            int(self.white_bb[i]), int(self.black_bb[i]), bool(self.turn_is_white[i])
+        )
+
+    def to_array(self) -> np.ndarray:
+        """
+        All boards as an (n_envs, 8, 8) int64 array (1 white, -1 black, 0 empty).
+
+        One unpack over the whole batch; wrap with torch.from_numpy to feed a network.
+        """
+        return _bitboards_to_cells(self.white_bb, self.black_bb)
+
+    def step_targets(self) -> np.ndarray:
+        """
+        Single-step destinations for the side to move in every game.
+
+        Returns:
+            (n_envs, 4) uint64 bitboards of the squares reachable by one step
+            north, east, south and west.
+        """
+        own = np.where(self.turn_is_white, self.white_bb, self.black_bb)
+        empty = ~(self.white_bb | self.black_bb)
+        return np.stack(
+            [
+                (own >> np.uint64(8)) & empty,
+                (own << np.uint64(1)) & np.uint64(NOT_A_FILE) & empty,
+                (own << np.uint64(8)) & empty,
+                (own >> np.uint64(1)) & np.uint64(NOT_H_FILE) & empty,
+            ],
+            axis=1,
+        )
+
+    def winners(self) -> np.ndarray:
+        """Per-game winner: 1 white, -1 black, 0 none (same rule as Ugolki._check_winner)."""
+        white_won = np.bitwise_count(self.white_bb & np.uint64(BLACK_CORNER)) == 16
+        black_won = np.bitwise_count(self.black_bb & np.uint64(WHITE_CORNER)) == 16
+        return np.where(white_won, 1, np.where(black_won, -1, 0)).astype(np.int8)
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Apply one packed action per game (no validation) and switch turns.
+
+        Args:
+            actions: (n_envs, 2) integer array of (from_square, to_square).
+
+        Returns:
+            rewards: float32, 10.0 if the mover won, -10.0 if the opponent has, else 0.0
+            done: bool, True where the game has a winner
+            winners: int8, as returned by `winners`
+        """
+        squares = np.asarray(actions).astype(np.uint64)
+        move_mask = (np.uint64(1) << squares[:, 0]) | (np.uint64(1) << squares[:, 1])
+        moving_is_white = self.turn_is_white.copy()
+
+        self.white_bb ^= np.where(moving_is_white, move_mask, np.uint64(0))
+        self.black_bb ^= np.where(moving_is_white, np.uint64(0), move_mask)
+        self.turn_is_white ^= True
+
+        winners = self.winners()
+        done = winners != 0
+        mover = np.where(moving_is_white, 1, -1)
+        rewards = np.where(done, np.where(winners == mover, 10.0, -10.0), 0.0)
+        return rewards.astype(np.float32), done, winners
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import os
+
+# Point the backend at a private in-memory database before it creates its engine
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+
+from fastapi import WebSocketDisconnect
+import numpy as np
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.api import game_websocket as ws
+from backend.models.database import Game, User, async_session_maker, engine, init_db
+from roulette.game import Ugolki
+
+
+@pytest.fixture(autouse=True)
+def clear_game_registries():
+    """Each test starts without loaded games or connections."""
+    yield
+    ws.active_connections.clear()
+    ws.active_games.clear()
+    ws.active_agents.clear()
+
+
+def run_with_db(scenario):
+    """Run `scenario()` on a fresh in-memory database, discarded afterwards."""
+    async def wrapper():
+        await init_db()
+        try:
+            return await scenario()
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(wrapper())
+
+
+async def create_user(username: str) -> int:
+    async with async_session_maker() as db:
+        result = await db.execute(
+            insert(User)
+            .values(username=username, email=f"{username}@example.com", password_hash="x")
+            .returning(User.id)
+        )
+        await db.commit()
+        return result.scalar_one()
+
+
+class RecordingWebSocket:
+    """Stand-in socket that records each sent frame."""
+
+    def __init__(self, disconnected: bool = False):
+        self.frames: list[str] = []
+        self.disconnected = disconnected
+
+    async def send_text(self, frame: str) -> None:
+        if self.disconnected:
+            raise WebSocketDisconnect()
+        self.frames.append(frame)
+
+
+def next_message(channel: ws.Channel) -> dict:
+    """Decode the next queued outbound message."""
+    return json.loads(channel.queue.get_nowait()[1])
+
+
+async def start_pvp_game(white: ws.Channel, black: ws.Channel) -> tuple[int, int, int]:
+    """Create a PvP game for two new users; returns (game_id, white_id, black_id)."""
+    white_id = await create_user("alice")
+    black_id = await create_user("bob")
+    async with async_session_maker() as db:
+        await ws.handle_create_game(white, white_id, {"game_type": "pvp"}, db)
+    game_id = next_message(white)["data"]["game_id"]
+    async with async_session_maker() as db:
+        await ws.handle_join_game(black, black_id, {"game_id": game_id}, db)
+    next_message(white)
+    next_message(black)
+    return game_id, white_id, black_id
+
+
+class TestHandleMove:
+    """Tests for handle_move."""
+
+    @pytest.mark.parametrize(
+        "from_pos, to_pos",
+        [
+            ([[0], 0], [0, 4]),
+            ([0, 3], "04"),
+            ([0, 3, 1], [0, 4]),
+            ([True, 3], [0, 4]),
+        ],
+    )
+    def test_malformed_move_is_illegal(self, from_pos, to_pos):
+        """Positions that aren't two ints are rejected as illegal, not raised on."""
+        async def scenario():
+            user_id = await create_user("alice")
+            channel = ws.Channel(websocket=None)
+            async with async_session_maker() as db:
+                await ws.handle_create_game(channel, user_id, {"game_type": "ai"}, db)
+            game_id = next_message(channel)["data"]["game_id"]
+
+            async with async_session_maker() as db:
+                await ws.handle_move(
+                    channel, user_id, {"game_id": game_id, "from": from_pos, "to": to_pos}, db
+                )
+            return next_message(channel)
+
+        assert run_with_db(scenario) == {"type": "error", "data": {"message": "Illegal move"}}
+
+    def test_move_does_not_build_state_tensor(self, monkeypatch):
+        """Moves are applied without torch, so the server runs without the torch extra."""
+        def no_tensor(self):
+            raise AssertionError("handle_move built a state tensor")
+
+        monkeypatch.setattr(Ugolki, "_to_tensor", no_tensor)
+
+        async def scenario():
+            white, black = ws.Channel(websocket=None), ws.Channel(websocket=None)
+            game_id, white_id, _ = await start_pvp_game(white, black)
+            async with async_session_maker() as db:
+                await ws.handle_move(
+                    white, white_id, {"game_id": game_id, "from": [0, 3], "to": [0, 4]}, db
+                )
+            return next_message(black)
+
+        message = run_with_db(scenario)
+        assert message["type"] == "game_state"
+        assert message["data"]["board"][0][4] == 1
+        assert message["data"]["turn"] == "black"
+
+    def test_winning_pvp_move_is_broadcast_before_commit(self, monkeypatch):
+        """The game row and both ELO changes are committed together, after game_over is queued."""
+        commits = []
+        original_commit = AsyncSession.commit
+
+        async def recording_commit(session):
+            commits.append(white.queue.qsize())
+            await original_commit(session)
+
+        white, black = ws.Channel(websocket=None), ws.Channel(websocket=None)
+
+        async def scenario():
+            game_id, white_id, black_id = await start_pvp_game(white, black)
+            # One white move from filling black's corner
+            board = np.zeros((8, 8), dtype=np.int8)
+            board[4:, 4:] = 1
+            board[4, 4] = 0
+            board[3, 4] = 1
+            board[0, 0] = -1
+            ws.active_games[game_id] = Ugolki(board)
+
+            monkeypatch.setattr(AsyncSession, "commit", recording_commit)
+            async with async_session_maker() as db:
+                await ws.handle_move(
+                    white, white_id, {"game_id": game_id, "from": [3, 4], "to": [4, 4]}, db
+                )
+            async with async_session_maker() as db:
+                game = (await db.execute(select(Game).where(Game.id == game_id))).scalar_one()
+                players = (await db.execute(select(User).order_by(User.id))).scalars().all()
+            return game, players, white_id
+
+        game, players, white_id = run_with_db(scenario)
+
+        # Exactly one commit, made once game_state and game_over were queued
+        assert commits == [2]
+        assert game.status == "completed"
+        assert game.winner_id == white_id
+        assert players[0].elo > 1200 > players[1].elo
+
+
+def fill_queue(channel: ws.Channel, msg_types: list[str]) -> None:
+    for i, msg_type in enumerate(msg_types):
+        channel.queue.put_nowait((msg_type, str(i)))
+
+
+def drain_queue(channel: ws.Channel) -> list[tuple[str, str]]:
+    """Consume every queued message the way the relay does, marking each done."""
+    messages = []
+    while not channel.queue.empty():
+        messages.append(channel.queue.get_nowait())
+        channel.queue.task_done()
+    return messages
+
+
+class TestEnqueue:
+    """Tests for enqueue and drop_stale_message."""
+
+    def test_appends_when_not_full(self):
+        channel = ws.Channel(websocket=None)
+        fill_queue(channel, ["game_state", "error"])
+        ws.enqueue(channel, "game_over", "new")
+
+        assert drain_queue(channel) == [("game_state", "0"), ("error", "1"), ("game_over", "new")]
+
+    def test_full_queue_drops_oldest_droppable_message(self):
+        channel = ws.Channel(websocket=None)
+        msg_types = ["error", "game_state", "open_games", "game_state"]
+        msg_types += ["error"] * (ws.OUTBOUND_QUEUE_SIZE - len(msg_types))
+        fill_queue(channel, msg_types)
+
+        ws.enqueue(channel, "game_over", "new")
+
+        messages = drain_queue(channel)
+        assert len(messages) == ws.OUTBOUND_QUEUE_SIZE
+        # Only the first game_state is gone; the rest keep their order
+        assert messages[:3] == [("error", "0"), ("open_games", "2"), ("game_state", "3")]
+        assert messages[-1] == ("game_over", "new")
+
+    def test_drop_keeps_task_done_paired(self):
+        """After a drop, join() completes once every remaining message is consumed."""
+        async def scenario():
+            channel = ws.Channel(websocket=None)
+            fill_queue(channel, ["game_state"] * ws.OUTBOUND_QUEUE_SIZE)
+            ws.enqueue(channel, "game_over", "new")
+            ws.enqueue(channel, "game_over", "newer")
+            drain_queue(channel)
+            await asyncio.wait_for(channel.queue.join(), timeout=1)
+
+        asyncio.run(scenario())
+
+    def test_full_queue_without_droppable_message_raises(self):
+        channel = ws.Channel(websocket=None)
+        fill_queue(channel, ["error"] * ws.OUTBOUND_QUEUE_SIZE)
+
+        with pytest.raises(asyncio.QueueFull):
+            ws.enqueue(channel, "game_over", "new")
+
+        assert drain_queue(channel) == [("error", str(i)) for i in range(ws.OUTBOUND_QUEUE_SIZE)]
+
+
+def run_relay(channel: ws.Channel) -> None:
+    """Relay the channel's queued messages, then stop the relay."""
+    async def scenario():
+        channel.relay_task = asyncio.create_task(ws.relay(channel))
+        await asyncio.wait_for(ws.flush(channel), timeout=1)
+        channel.relay_task.cancel()
+
+    asyncio.run(scenario())
+
+
+class TestRelay:
+    """Tests for relay."""
+
+    def test_single_message_is_sent_as_is(self):
+        channel = ws.Channel(websocket=RecordingWebSocket())
+        ws.send_message(channel, "error", {"message": "Illegal move"})
+        run_relay(channel)
+
+        assert [json.loads(frame) for frame in channel.websocket.frames] == [
+            {"type": "error", "data": {"message": "Illegal move"}}
+        ]
+
+    def test_queued_messages_are_sent_as_one_batch_frame(self):
+        channel = ws.Channel(websocket=RecordingWebSocket())
+        ws.send_message(channel, "game_state", {"turn": "black"})
+        ws.send_message(channel, "game_over", {"winner": "white"})
+        run_relay(channel)
+
+        assert len(channel.websocket.frames) == 1
+        assert json.loads(channel.websocket.frames[0]) == {
+            "type": "batch",
+            "msgs": [
+                {"type": "game_state", "data": {"turn": "black"}},
+                {"type": "game_over", "data": {"winner": "white"}},
+            ],
+        }
+
+    def test_stops_when_client_disconnects(self):
+        async def scenario():
+            channel = ws.Channel(websocket=RecordingWebSocket(disconnected=True))
+            ws.send_message(channel, "error", {"message": "Illegal move"})
+            await asyncio.wait_for(ws.relay(channel), timeout=1)
+
+        asyncio.run(scenario())
@@ -1,7 +1,8 @@
+import numpy as np
 import torch
 import pytest
 
-from roulette.game import Ugolki
+from roulette.game import Ugolki, VecUgolki
 
 
 class TestGetLegalActions:
@@ -157,6 +158,38 @@ class TestGetLegalActions:
         for (from_row, from_col), _ in actions:
             assert (from_row, from_col) == (5, 5)
 
+    def test_legal_action_set_matches_list(self):
+        """get_legal_action_set holds exactly the actions from get_legal_actions."""
+        game = Ugolki.create_game()
+
+        assert game.get_legal_action_set() == set(game.get_legal_actions())
+
+    def test_legal_actions_iter_matches_list(self):
+        """get_legal_actions_iter yields the same actions as get_legal_actions."""
+        fresh = Ugolki.create_game()
+        iterated = list(fresh.get_legal_actions_iter())
+
+        assert sorted(iterated) == sorted(Ugolki.create_game().get_legal_actions())
+
+    def test_packed_actions_match_list(self):
+        """Packed (from_square, to_square) rows decode to the same actions."""
+        game = Ugolki.create_game()
+        packed = game.get_legal_actions_packed()
+
+        assert packed.shape == (16, 2)
+        assert packed.dtype == np.int16
+        decoded = {
+            (divmod(int(src), 8), divmod(int(dst), 8)) for src, dst in packed.tolist()
+        }
+        assert decoded == set(game.get_legal_actions())
+
+    def test_modifying_returned_actions_does_not_affect_cache(self):
+        """Callers get their own list; the memoized actions stay intact."""
+        game = Ugolki.create_game()
+        game.get_legal_actions().clear()
+
+        assert len(Ugolki.create_game().get_legal_actions()) == 16
+
     def test_no_diagonal_moves(self):
         """Diagonal moves are not allowed."""
         board = torch.zeros((8, 8), dtype=torch.long)
@@ -260,6 +293,17 @@ class TestStepAndWinConditions:
         assert result.reward == 10.0
         assert result.info["winner"] == "black"
 
+    def test_play_returns_winner(self):
+        """play applies the move and reports the winner without a StepResult."""
+        board = torch.zeros((8, 8), dtype=torch.long)
+        board[4:, 4:] = 1
+        board[4, 4] = 0
+        board[3, 4] = 1
+        game = Ugolki(board)
+
+        assert game.play(((3, 4), (4, 4))) == "white"
+        assert game.turn == "black"
+
     def test_no_winner_with_pieces_not_in_corner(self):
         """No winner if pieces are not all in opponent's corner."""
         game = Ugolki.create_game()
@@ -303,3 +347,137 @@ class TestStepAndWinConditions:
 
         assert result.state[3, 3].item() == 0
         assert result.state[3, 4].item() == 1
+
+    def test_turn_setter_accepts_strings(self):
+        """Setting turn from a string updates the side to move."""
+        game = Ugolki.create_game()
+        game.turn = "black"
+
+        assert game.turn == "black"
+        assert game.turn_is_white is False
+
+    def test_turn_setter_rejects_unknown_player(self):
+        """Setting turn to anything but white/black raises."""
+        game = Ugolki.create_game()
+
+        with pytest.raises(ValueError):
+            game.turn = "red"
+
+    def test_step_accepts_packed_action(self):
+        """A packed row from get_legal_actions_packed moves the same piece."""
+        board = torch.zeros((8, 8), dtype=torch.long)
+        board[3, 3] = 1
+        game = Ugolki(board)
+        game.turn = "white"
+
+        result = game.step(np.array([3 * 8 + 3, 3 * 8 + 4], dtype=np.int16))
+
+        assert result.state[3, 3].item() == 0
+        assert result.state[3, 4].item() == 1
+        assert game.turn == "black"
+
+    def test_to_array_matches_board(self):
+        """to_array gives the same cells as the board tensor."""
+        game = Ugolki.create_game()
+        game.step(game.get_legal_actions()[0])
+
+        assert game.to_array().tolist() == game.board.tolist()
+
+    def test_legal_actions_recomputed_after_step(self):
+        """Memoized legal actions must not outlive the position they were computed for."""
+        board = torch.zeros((8, 8), dtype=torch.long)
+        board[3, 3] = 1
+        board[5, 5] = -1
+        game = Ugolki(board)
+        game.turn = "white"
+
+        assert ((3, 3), (3, 4)) in game.get_legal_actions()
+        game.step(((3, 3), (3, 4)))
+
+        actions = game.get_legal_actions()
+        assert actions
+        for from_pos, _ in actions:
+            assert from_pos == (5, 5)
+
+
+class TestRandomGames:
+    """Tests for random position generation."""
+
+    def test_random_game_is_reproducible_with_seeded_rng(self):
+        """The same generator seed gives the same position."""
+        first = Ugolki.create_random_game(num_moves=20, rng=np.random.default_rng(7))
+        second = Ugolki.create_random_game(num_moves=20, rng=np.random.default_rng(7))
+
+        assert first.board.tolist() == second.board.tolist()
+        assert first.turn == second.turn
+
+    def test_create_random_games_returns_batch(self):
+        """create_random_games plays the requested number of moves in each game."""
+        games = Ugolki.create_random_games(4, 3, rng=np.random.default_rng(0))
+
+        assert len(games) == 4
+        for game in games:
+            # Three moves from white's start leave black to move
+            assert game.turn == "black"
+            assert (game.to_array() == 1).sum() == 16
+            assert (game.to_array() == -1).sum() == 16
+
+
+class TestVecUgolki:
+    """Tests for the batched VecUgolki engine."""
+
+    def test_step_matches_single_game(self):
+        """Stepping the batch gives the same positions as stepping each game alone."""
+        rng = np.random.default_rng(3)
+        vec = VecUgolki(8)
+        games = [Ugolki.create_game() for _ in range(8)]
+
+        for _ in range(30):
+            actions = []
+            for game in games:
+                packed = game.get_legal_actions_packed()
+                actions.append(packed[rng.integers(len(packed))])
+            actions = np.array(actions)
+
+            vec.step(actions)
+            for game, action in zip(games, actions):
+                game.step(action)
+
+        for i, game in enumerate(games):
+            assert vec.game(i).board.tolist() == game.board.tolist()
+            assert vec.game(i).turn == game.turn
+
+    def test_to_array_matches_each_game(self):
+        """The batched board array agrees with each game's own board."""
+        vec = VecUgolki(3)
+        vec.step(np.array([[3, 4], [3 * 8, 4 * 8], [3 * 8 + 3, 3 * 8 + 4]]))
+
+        boards = vec.to_array()
+        assert boards.shape == (3, 8, 8)
+        for i in range(3):
+            assert boards[i].tolist() == vec.game(i).to_array().tolist()
+
+    def test_step_targets_at_start(self):
+        """At start, white's only single steps lead out of the corner's edge squares."""
+        targets = VecUgolki(2).step_targets()
+
+        assert targets.shape == (2, 4)
+        step_count = sum(int(bb).bit_count() for bb in targets[0])
+        assert step_count == 8
+
+    def test_winning_move_reports_done(self):
+        """A move that completes white's corner ends only that game."""
+        board = torch.zeros((8, 8), dtype=torch.long)
+        board[4:, 4:] = 1
+        board[4, 4] = 0
+        board[3, 4] = 1
+        game = Ugolki(board)
+        vec = VecUgolki(2)
+        vec.white_bb[:] = game.white_bb
+        vec.black_bb[:] = game.black_bb
+
+        rewards, done, winners = vec.step(np.array([[3 * 8 + 4, 4 * 8 + 4], [3 * 8 + 4, 2 * 8 + 4]]))
+
+        assert done.tolist() == [True, False]
+        assert winners.tolist() == [1, 0]
+        assert rewards.tolist() == [10.0, 0.0]